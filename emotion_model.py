@@ -5,32 +5,161 @@ This module handles emotion detection from user text input using a pre-trained
 transformer model from HuggingFace. It analyzes the user's mood description
 and returns the predicted emotion label.
 
+When a quantized ONNX export of the model is available (see
+export_onnx_model.py), it is run directly with ONNX Runtime instead of the
+PyTorch pipeline for lower CPU latency.
+
 Dependencies:
 - transformers
 - torch
+- numpy
+- optimum[onnxruntime] (optional, for the quantized ONNX model)
 """
 
-from transformers import pipeline
+from collections import Counter, OrderedDict
+import bisect
+import functools
+import os
+import types
 import warnings
 
+# Emotion classification model and its quantized ONNX export
+MODEL_NAME = "nateraw/bert-base-uncased-emotion"
+ONNX_MODEL_DIR = "onnx_model"
+QUANTIZED_MODEL_DIR = "onnx_model_quantized"
+OPTIMIZED_MODEL_FILE = "model_opt.onnx"
+QUANTIZED_MODEL_FILE = "model_opt_quant.onnx"
+
+# Apply PyTorch dynamic INT8 quantization when running the pipeline fallback.
+# Check validate_dynamic_quantization() on representative inputs before enabling.
+DYNAMIC_QUANTIZATION = False
+
+# Number of texts sent through the model per forward pass
+BATCH_SIZE = 16
+
+# Number of distinct inputs whose detection results are kept in memory
+CACHE_SIZE = 1024
+
 # Suppress transformers warnings for cleaner output
 warnings.filterwarnings("ignore", category=UserWarning, module="transformers")
 
+
+@functools.lru_cache(maxsize=1)
+def _configure_torch_threads():
+    """
+    Set PyTorch CPU thread counts once per process.
+    
+    Uses every core for intra-op work and a single inter-op thread to
+    avoid oversubscribing the CPU.
+    """
+    import torch
+    
+    torch.set_num_threads(os.cpu_count() or 1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before torch has started any inter-op parallel work
+        pass
+
+
 class EmotionDetector:
     """
     A class to detect emotions from text using a pre-trained transformer model.
     """
     
-    def __init__(self):
+    # Mapping from model outputs to our standard emotion categories
+    _EMOTION_MAP = types.MappingProxyType({
+        # Joy/Happiness categories
+        'joy': 'joy',
+        'happiness': 'joy',
+        'love': 'love',
+        'positive': 'joy',
+    
+        # Sadness categories
+        'sadness': 'sadness',
+        'grief': 'sadness',
+        'negative': 'sadness',
+    
+        # Anger categories
+        'anger': 'anger',
+        'rage': 'anger',
+        'frustration': 'anger',
+    
+        # Fear categories
+        'fear': 'fear',
+        'anxiety': 'fear',
+        'worry': 'fear',
+    
+        # Surprise categories
+        'surprise': 'surprise',
+        'amazement': 'surprise',
+    
+        # Neutral/Other
+        'neutral': 'neutral',
+        'disgust': 'neutral',  # Map disgust to neutral for movie recommendations
+        'anticipation': 'surprise',
+        'trust': 'joy'
+    })
+    
+    # Lower bounds of the low, medium and high confidence levels
+    _CONFIDENCE_THRESHOLDS = (0.4, 0.6, 0.8)
+    _CONFIDENCE_LEVELS = ('very_low', 'low', 'medium', 'high')
+    
+    def __init__(self, onnx_model_dir=None, dynamic_quantization=None):
         """
         Initialize the emotion detection pipeline using a pre-trained model.
         Uses nateraw/bert-base-uncased-emotion for robust emotion classification.
+        
+        Args:
+            onnx_model_dir (str): Directory holding the quantized ONNX export,
+                or "" to always use the PyTorch pipeline. Defaults to
+                QUANTIZED_MODEL_DIR.
+            dynamic_quantization (bool): Quantize the pipeline model's Linear
+                layers to INT8 when the ONNX model is not used. Defaults to
+                DYNAMIC_QUANTIZATION.
         """
+        # Read the module settings at call time so they can be changed at runtime
+        if onnx_model_dir is None:
+            onnx_model_dir = QUANTIZED_MODEL_DIR
+        if dynamic_quantization is None:
+            dynamic_quantization = DYNAMIC_QUANTIZATION
+        
+        self.classifier = None
+        self.session = None
+        
+        # Set once the pipeline model's Linear layers have been quantized to INT8
+        self.quantized = False
+        
+        # Recent detection results keyed on normalized input text
+        self._cache = OrderedDict()
+        
+        if onnx_model_dir and os.path.isdir(onnx_model_dir):
+            try:
+                self._load_onnx_model(onnx_model_dir)
+                print("✅ Quantized ONNX emotion model loaded successfully!")
+                self._warmup()
+                return
+                
+            except Exception as e:
+                print(f"⚠️  Could not load ONNX model from '{onnx_model_dir}': {e}")
+                print("🔄 Falling back to the PyTorch pipeline...")
+                self.session = None
+        
+        # Imported here so importing this module doesn't pay for torch
+        from transformers import AutoTokenizer, pipeline
+        
+        _configure_torch_threads()
+        
         try:
-            # Load the pre-trained emotion classification model
+            # Load the pre-trained emotion classification model with the
+            # Rust-backed fast tokenizer
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
+            self._check_fast_tokenizer(tokenizer)
+            
             self.classifier = pipeline(
                 "text-classification",
-                model="nateraw/bert-base-uncased-emotion",
+                model=MODEL_NAME,
+                tokenizer=tokenizer,
                 device=-1  # Use CPU (set to 0 for GPU if available)
             )
             print("✅ Emotion detection model loaded successfully!")
@@ -44,6 +173,151 @@ class EmotionDetector:
                 "sentiment-analysis",
                 model="distilbert-base-uncased-finetuned-sst-2-english"
             )
+        
+        if dynamic_quantization:
+            # A quantization failure keeps the working FP32 model
+            try:
+                self._quantize_pipeline_model()
+                print("✅ Emotion model quantized to INT8!")
+                
+            except Exception as e:
+                print(f"⚠️  Dynamic quantization failed, keeping the FP32 model: {e}")
+        
+        self._warmup()
+    
+    def _check_fast_tokenizer(self, tokenizer):
+        """
+        Warn when the Rust-backed fast tokenizer could not be loaded.
+        
+        Args:
+            tokenizer: Tokenizer returned by AutoTokenizer
+        """
+        from transformers import PreTrainedTokenizerFast
+        
+        if not isinstance(tokenizer, PreTrainedTokenizerFast):
+            print("⚠️  Fast tokenizer unavailable, falling back to the slower Python tokenizer.")
+    
+    def _warmup(self):
+        """
+        Run one throwaway prediction so lazy initialization happens at startup.
+        
+        The first call through the pipeline or ONNX Runtime session pages in
+        weights and prepares kernels, which would otherwise slow down the
+        user's first query.
+        """
+        try:
+            if self.session is None:
+                import torch
+                
+                with torch.inference_mode():
+                    self.classifier("ok")
+            else:
+                inputs = self.tokenizer("ok", padding="max_length", max_length=8,
+                                        truncation=True, return_tensors="np")
+                feed = {name: inputs[name] for name in self.session_inputs if name in inputs}
+                self.session.run(None, feed)
+                
+        except Exception as e:
+            print(f"⚠️  Emotion model warmup failed: {e}")
+    
+    def _load_onnx_model(self, model_dir):
+        """
+        Load the quantized ONNX model and its tokenizer.
+        
+        Args:
+            model_dir (str): Directory holding the quantized ONNX export
+        """
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoConfig, AutoTokenizer
+        
+        # An export of a previous MODEL_NAME would otherwise load silently
+        exported_model = getattr(AutoConfig.from_pretrained(model_dir), 'emotion_model_name', None)
+        if exported_model != MODEL_NAME:
+            raise ValueError(f"it was exported from {exported_model or 'an unknown model'}, "
+                             f"not {MODEL_NAME}; re-run export_onnx_model.py")
+        
+        model = ORTModelForSequenceClassification.from_pretrained(
+            model_dir,
+            file_name=QUANTIZED_MODEL_FILE
+        )
+        tokenizer = AutoTokenizer.from_pretrained(model_dir, use_fast=True)
+        self._check_fast_tokenizer(tokenizer)
+        
+        # Keep the raw ONNX Runtime session to skip the pipeline overhead
+        session = model.model
+        session_inputs = [node.name for node in session.get_inputs()]
+        id2label = model.config.id2label
+        
+        # Only switch to the ONNX backend once everything above succeeded
+        self.tokenizer = tokenizer
+        self.session_inputs = session_inputs
+        self.id2label = id2label
+        self.session = session
+    
+    def _quantize_pipeline_model(self):
+        """
+        Replace the pipeline model's Linear layers with dynamic INT8 versions.
+        """
+        import torch
+        
+        self.classifier.model = torch.quantization.quantize_dynamic(
+            self.classifier.model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        self.quantized = True
+    
+    def _classify(self, texts):
+        """
+        Run the classifier on a batch of texts and return their top predictions.
+        
+        Args:
+            texts (List[str]): Cleaned, non-empty user inputs
+            
+        Returns:
+            List[dict]: Top prediction with 'label' and 'score' keys per text
+        """
+        if self.session is None:
+            import torch
+            
+            with torch.inference_mode():
+                predictions = self.classifier(texts, batch_size=BATCH_SIZE, truncation=True)
+            return [p[0] if isinstance(p, list) else p for p in predictions]
+        
+        import numpy as np
+        
+        predictions = []
+        for start in range(0, len(texts), BATCH_SIZE):
+            batch = texts[start:start + BATCH_SIZE]
+            inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors="np")
+            feed = {name: inputs[name] for name in self.session_inputs if name in inputs}
+            logits = self.session.run(None, feed)[0]
+            
+            # Softmax over each row of logits, then take the most likely label
+            scores = np.exp(logits - logits.max(axis=1, keepdims=True))
+            scores /= scores.sum(axis=1, keepdims=True)
+            label_ids = scores.argmax(axis=1)
+            
+            predictions.extend(
+                {'label': self.id2label[int(label_id)], 'score': float(row[label_id])}
+                for row, label_id in zip(scores, label_ids)
+            )
+        
+        return predictions
+    
+    def _neutral_result(self):
+        """
+        Build the result returned for empty input or failed detection.
+        
+        Returns:
+            dict: Neutral emotion result with zero confidence
+        """
+        return {
+            'emotion': 'neutral',
+            'confidence': 0.0,
+            'raw_prediction': None,
+            'normalized_emotion': 'neutral'
+        }
     
     def detect_emotion(self, text):
         """
@@ -55,41 +329,88 @@ class EmotionDetector:
         Returns:
             dict: Contains emotion label, confidence score, and normalized emotion
         """
-        if not text or not text.strip():
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'raw_prediction': None,
-                'normalized_emotion': 'neutral'
-            }
+        return self.detect_emotions([text])[0]
+    
+    def detect_emotions(self, texts):
+        """
+        Detect emotions for several texts with one batched model call.
         
-        try:
-            # Get prediction from the model
-            prediction = self.classifier(text.strip())
+        Args:
+            texts (List[str]): User mood descriptions
             
-            # Extract the top prediction
-            top_prediction = prediction[0] if isinstance(prediction, list) else prediction
-            emotion_label = top_prediction['label'].lower()
-            confidence = top_prediction['score']
+        Returns:
+            List[dict]: One detect_emotion() style result per input text
+        """
+        results = [None] * len(texts)
+        
+        # Group inputs that still need the model by their cache key
+        pending = {}
+        for i, text in enumerate(texts):
+            key = self._cache_key(text)
             
-            # Normalize emotion labels to standard categories
-            normalized_emotion = self._normalize_emotion(emotion_label)
+            if not key:
+                # Empty inputs get the neutral result and are not sent to the model
+                results[i] = self._neutral_result()
+            elif key in self._cache:
+                self._cache.move_to_end(key)
+                results[i] = dict(self._cache[key])
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        if not pending:
+            return results
+        
+        keys = list(pending)
+        try:
+            # Get the top prediction for each distinct text from the model
+            predictions = self._classify(keys)
             
-            return {
-                'emotion': emotion_label,
-                'confidence': confidence,
-                'raw_prediction': top_prediction,
-                'normalized_emotion': normalized_emotion
-            }
+            for key, top_prediction in zip(keys, predictions):
+                emotion_label = top_prediction['label'].casefold()
+                
+                result = {
+                    'emotion': emotion_label,
+                    'confidence': top_prediction['score'],
+                    'raw_prediction': top_prediction,
+                    # Normalize emotion labels to standard categories
+                    'normalized_emotion': self._normalize_emotion(emotion_label)
+                }
+                self._remember(key, result)
+                
+                for i in pending[key]:
+                    results[i] = dict(result)
             
         except Exception as e:
             print(f"❌ Error during emotion detection: {e}")
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'raw_prediction': None,
-                'normalized_emotion': 'neutral'
-            }
+        
+        # Anything left unset failed during detection
+        return [result or self._neutral_result() for result in results]
+    
+    def _cache_key(self, text):
+        """
+        Build the cache key for a user input.
+        
+        Whitespace is collapsed and case is folded, since the model is uncased.
+        
+        Args:
+            text (str): User's mood description
+            
+        Returns:
+            str: Normalized text, empty for blank input
+        """
+        return " ".join(text.lower().split()) if text else ""
+    
+    def _remember(self, key, result):
+        """
+        Store a detection result, evicting the least recently used entry when full.
+        
+        Args:
+            key (str): Cache key from _cache_key
+            result (dict): Detection result for that key
+        """
+        self._cache[key] = result
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
     
     def _normalize_emotion(self, emotion_label):
         """
@@ -101,41 +422,7 @@ class EmotionDetector:
         Returns:
             str: Normalized emotion category
         """
-        # Mapping from model outputs to our standard emotion categories
-        emotion_mapping = {
-            # Joy/Happiness categories
-            'joy': 'joy',
-            'happiness': 'joy',
-            'love': 'love',
-            'positive': 'joy',
-            
-            # Sadness categories
-            'sadness': 'sadness',
-            'grief': 'sadness',
-            'negative': 'sadness',
-            
-            # Anger categories
-            'anger': 'anger',
-            'rage': 'anger',
-            'frustration': 'anger',
-            
-            # Fear categories
-            'fear': 'fear',
-            'anxiety': 'fear',
-            'worry': 'fear',
-            
-            # Surprise categories
-            'surprise': 'surprise',
-            'amazement': 'surprise',
-            
-            # Neutral/Other
-            'neutral': 'neutral',
-            'disgust': 'neutral',  # Map disgust to neutral for movie recommendations
-            'anticipation': 'surprise',
-            'trust': 'joy'
-        }
-        
-        return emotion_mapping.get(emotion_label, 'neutral')
+        return self._EMOTION_MAP.get(emotion_label.casefold(), 'neutral')
     
     def get_emotion_confidence_level(self, confidence):
         """
@@ -147,14 +434,34 @@ class EmotionDetector:
         Returns:
             str: Confidence level description
         """
-        if confidence >= 0.8:
-            return "high"
-        elif confidence >= 0.6:
-            return "medium"
-        elif confidence >= 0.4:
-            return "low"
-        else:
-            return "very_low"
+        # bisect_right so a score equal to a threshold gets the higher level
+        return self._CONFIDENCE_LEVELS[bisect.bisect_right(self._CONFIDENCE_THRESHOLDS, confidence)]
+    
+    def get_emotion_confidence_levels(self, confidences):
+        """
+        Categorize many confidence scores at once, e.g. from detect_emotions().
+        
+        Args:
+            confidences (array-like): Confidence scores from model
+            
+        Returns:
+            numpy.ndarray: Confidence level description per score
+        """
+        import numpy as np
+        
+        indices = np.searchsorted(self._CONFIDENCE_THRESHOLDS, confidences, side='right')
+        return np.array(self._CONFIDENCE_LEVELS)[indices]
+
+
+@functools.lru_cache(maxsize=1)
+def get_emotion_detector():
+    """
+    Get the shared EmotionDetector instance, loading the model on first use.
+    
+    Returns:
+        EmotionDetector: Process-wide emotion detector
+    """
+    return EmotionDetector()
 
 
 def detect_emotion(text):
@@ -167,7 +474,7 @@ def detect_emotion(text):
     Returns:
         str: Normalized emotion label
     """
-    detector = EmotionDetector()
+    detector = get_emotion_detector()
     result = detector.detect_emotion(text)
     return result['normalized_emotion']
 
@@ -182,10 +489,45 @@ def detect_emotion_detailed(text):
     Returns:
         dict: Detailed emotion analysis results
     """
-    detector = EmotionDetector()
+    detector = get_emotion_detector()
     return detector.detect_emotion(text)
 
 
+def validate_dynamic_quantization(texts, tolerance=0.02):
+    """
+    Compare emotion predictions of the FP32 and dynamically quantized models.
+    
+    Args:
+        texts (List[str]): Held-out mood descriptions
+        tolerance (float): Maximum allowed difference in each emotion's share
+        
+    Returns:
+        bool: True if every emotion's share is within tolerance of FP32,
+            False if the model could not be quantized
+    """
+    fp32_detector = EmotionDetector(onnx_model_dir="", dynamic_quantization=False)
+    int8_detector = EmotionDetector(onnx_model_dir="", dynamic_quantization=True)
+    
+    # A failed quantization keeps the FP32 model, which would trivially match
+    if not int8_detector.quantized:
+        print("❌ Dynamic quantization failed, nothing to validate.")
+        return False
+    
+    fp32_counts = Counter(r['normalized_emotion'] for r in fp32_detector.detect_emotions(texts))
+    int8_counts = Counter(r['normalized_emotion'] for r in int8_detector.detect_emotions(texts))
+    
+    within_tolerance = True
+    for emotion in sorted(set(fp32_counts) | set(int8_counts)):
+        fp32_share = fp32_counts[emotion] / len(texts)
+        int8_share = int8_counts[emotion] / len(texts)
+        print(f"{emotion}: FP32 {fp32_share:.1%} vs INT8 {int8_share:.1%}")
+        
+        if abs(fp32_share - int8_share) > tolerance:
+            within_tolerance = False
+    
+    return within_tolerance
+
+
 # Test function for development
 if __name__ == "__main__":
     # Test the emotion detection
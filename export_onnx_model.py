@@ -0,0 +1,101 @@
+"""
+ONNX Export Script for Mood-Based Movie Recommendation System
+
+This script exports the emotion classification model to ONNX, fuses its
+transformer layers with the ONNX Runtime optimizer and applies dynamic INT8
+quantization, producing the model directory that EmotionDetector loads with
+ONNX Runtime. Run it once at build time.
+
+Usage:
+    python export_onnx_model.py
+
+Dependencies:
+    - optimum[onnxruntime]
+    - transformers
+"""
+
+from onnxruntime.transformers.optimizer import optimize_model
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoConfig, AutoTokenizer
+import os
+
+from emotion_model import (
+    MODEL_NAME,
+    ONNX_MODEL_DIR,
+    OPTIMIZED_MODEL_FILE,
+    QUANTIZED_MODEL_DIR,
+)
+
+
+def export_onnx_model(model_name=MODEL_NAME, output_dir=ONNX_MODEL_DIR):
+    """
+    Export the HuggingFace emotion model to ONNX.
+
+    Args:
+        model_name (str): HuggingFace model identifier
+        output_dir (str): Directory to write the ONNX model to
+    """
+    print(f"📦 Exporting '{model_name}' to ONNX...")
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    # Recorded so EmotionDetector can reject exports of a different model
+    model.config.emotion_model_name = model_name
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"✅ ONNX model saved to '{output_dir}'")
+
+
+def optimize_onnx_model(onnx_dir=ONNX_MODEL_DIR):
+    """
+    Fuse LayerNorm, GELU and attention nodes with the ONNX Runtime
+    transformers optimizer.
+
+    Args:
+        onnx_dir (str): Directory holding the exported ONNX model
+    """
+    print("🔧 Fusing transformer layers...")
+    config = AutoConfig.from_pretrained(onnx_dir)
+    optimized_model = optimize_model(
+        os.path.join(onnx_dir, "model.onnx"),
+        model_type="bert",
+        num_heads=config.num_attention_heads,
+        hidden_size=config.hidden_size,
+        opt_level=99
+    )
+    optimized_model.save_model_to_file(os.path.join(onnx_dir, OPTIMIZED_MODEL_FILE))
+    print(f"✅ Optimized model saved as '{OPTIMIZED_MODEL_FILE}'")
+
+
+def quantize_onnx_model(onnx_dir=ONNX_MODEL_DIR, output_dir=QUANTIZED_MODEL_DIR):
+    """
+    Apply dynamic INT8 quantization to the optimized ONNX model.
+
+    Args:
+        onnx_dir (str): Directory holding the optimized ONNX model
+        output_dir (str): Directory to write the quantized model to
+    """
+    print("⚙️  Applying dynamic INT8 quantization...")
+    quantizer = ORTQuantizer.from_pretrained(onnx_dir, file_name=OPTIMIZED_MODEL_FILE)
+    quantization_config = AutoQuantizationConfig.avx512_vnni(
+        is_static=False,
+        per_channel=False
+    )
+    # Writes model_opt_quant.onnx, the file EmotionDetector loads
+    quantizer.quantize(
+        save_dir=output_dir,
+        quantization_config=quantization_config,
+        file_suffix="quant"
+    )
+
+    # The quantizer only writes the model and config, so copy the tokenizer too
+    tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"✅ Quantized model saved to '{output_dir}'")
+
+
+if __name__ == "__main__":
+    export_onnx_model()
+    optimize_onnx_model()
+    quantize_onnx_model()
@@ -6,7 +6,9 @@ to provide a complete user experience. It follows the exact flow specified
 in instructions.md.
 
 Usage:
-    python main.py
+    python main.py                      # Interactive mode
+    python main.py "I feel happy today"  # Analyze a single mood
+    python main.py --help               # Show this message
 
 Dependencies:
     - emotion_model
@@ -16,8 +18,8 @@ Dependencies:
     - requests
 """
 
-from emotion_model import EmotionDetector, detect_emotion_detailed
-from recommender import MovieRecommender
+from emotion_model import get_emotion_detector
+from recommender import get_movie_recommender
 import sys
 import time
 
@@ -36,11 +38,11 @@ class MoodMovieRecommendationAgent:
         try:
             # Initialize emotion detector
             print("🧠 Loading emotion detection model...")
-            self.emotion_detector = EmotionDetector()
+            self.emotion_detector = get_emotion_detector()
             
             # Initialize movie recommender
             print("🎭 Loading movie recommendation system...")
-            self.movie_recommender = MovieRecommender()
+            self.movie_recommender = get_movie_recommender()
             
             print("✅ System ready! Let's find some great movies for your mood!")
             print("=" * 60)
@@ -54,27 +56,81 @@ class MoodMovieRecommendationAgent:
         """
         Complete workflow: analyze mood and recommend movies.
         
+        A list of mood descriptions is analyzed in one batched model call.
+        
+        Args:
+            user_input (str or List[str]): User's mood description, or several of them
+            num_recommendations (int): Number of movies to recommend per mood
+            
+        Returns:
+            dict: Results containing emotion analysis and movie recommendations,
+                or a list of them when given a list of mood descriptions
+        """
+        if isinstance(user_input, str):
+            emotion_result = self._detect(user_input)
+            return self._recommend(emotion_result, num_recommendations)
+        
+        print(f"🔍 Analyzing {len(user_input)} mood descriptions...")
+        emotion_results = self.emotion_detector.detect_emotions(user_input)
+        
+        results = []
+        for text, emotion_result in zip(user_input, emotion_results):
+            print(f"\n💬 Mood: '{text}'")
+            self._report_emotion(emotion_result)
+            results.append(self._recommend(emotion_result, num_recommendations))
+        
+        return results
+    
+    def _detect(self, user_input):
+        """
+        Detect and report the emotion in a mood description.
+        
         Args:
             user_input (str): User's mood description
-            num_recommendations (int): Number of movies to recommend
             
         Returns:
-            dict: Results containing emotion analysis and movie recommendations
+            dict: Result from EmotionDetector.detect_emotion
         """
         # Step 1: Detect emotion from user input
         print(f"🔍 Analyzing your mood: '{user_input}'")
         emotion_result = self.emotion_detector.detect_emotion(user_input)
         
-        detected_emotion = emotion_result['normalized_emotion']
+        self._report_emotion(emotion_result)
+        return emotion_result
+    
+    def _report_emotion(self, emotion_result):
+        """
+        Print the detected emotion and warn when confidence is low.
+        
+        Args:
+            emotion_result (dict): Result from EmotionDetector.detect_emotion
+        """
         confidence = emotion_result['confidence']
         confidence_level = self.emotion_detector.get_emotion_confidence_level(confidence)
         
-        print(f"🎭 Detected emotion: {detected_emotion} (confidence: {confidence:.2f} - {confidence_level})")
+        print(f"🎭 Detected emotion: {emotion_result['normalized_emotion']} "
+              f"(confidence: {confidence:.2f} - {confidence_level})")
         
         # Step 2: Check if confidence is too low
         if confidence < 0.4:
             print("⚠️  Emotion detection confidence is low. You might want to provide more detail.")
             print("💡 Try describing your mood with more specific words or context.")
+    
+    def _recommend(self, emotion_result, num_recommendations, exclude_ids=None):
+        """
+        Recommend movies for an already detected emotion.
+        
+        Args:
+            emotion_result (dict): Result from EmotionDetector.detect_emotion
+            num_recommendations (int): Number of movies to recommend
+            exclude_ids (set): IMDb IDs of movies that were already shown
+            
+        Returns:
+            dict: Results containing emotion analysis and movie recommendations
+        """
+        detected_emotion = emotion_result['normalized_emotion']
+        confidence = emotion_result['confidence']
+        confidence_level = self.emotion_detector.get_emotion_confidence_level(confidence)
         
         # Step 3: Get movie recommendations based on emotion
         print(f"🎬 Finding movies that match your {detected_emotion} mood...")
@@ -82,7 +138,8 @@ class MoodMovieRecommendationAgent:
         try:
             recommendations = self.movie_recommender.recommend_movies(
                 detected_emotion, 
-                num_recommendations
+                num_recommendations,
+                exclude_ids=exclude_ids
             )
             
             if not recommendations:
@@ -148,7 +205,13 @@ class MoodMovieRecommendationAgent:
                     
                     if more_input in ['y', 'yes']:
                         print("🔄 Getting more recommendations...")
-                        self.analyze_mood_and_recommend(user_input, num_recommendations=5)
+                        # Reuse the detected emotion and skip movies already shown
+                        shown_ids = {movie['imdb_id'] for movie in result['recommendations']}
+                        self._recommend(
+                            result['emotion_analysis'],
+                            num_recommendations=5,
+                            exclude_ids=shown_ids
+                        )
                 
                 print("\\n" + "=" * 70)
                 print("🔄 Ready for another mood analysis!\\n")
@@ -169,6 +232,10 @@ def main():
     print("🤖 AI-Powered Movie Discovery Based on Your Current Mood")
     print("=" * 70)
     
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print(__doc__)
+        return
+    
     try:
         # Initialize the recommendation agent
         agent = MoodMovieRecommendationAgent()
@@ -9,38 +9,147 @@ This module handles the core recommendation logic including:
 Dependencies:
 - requests
 - json
+- requests-cache (optional, pip install requests-cache, caches OMDb responses on disk)
+- orjson (optional, pip install orjson, faster OMDb response parsing)
 """
 
-import requests
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import functools
 import json
 import random
 from typing import List, Dict, Optional
 
+# Decode OMDb responses with orjson when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Concurrent OMDb requests and per-request timeout in seconds
+MAX_WORKERS = 16
+REQUEST_TIMEOUT = 10
+
+# Consecutive failed OMDb requests after which a genre stops looking for movies
+MAX_CONSECUTIVE_FAILURES = 3
+
+# HTTP statuses OMDb answers with for an invalid key or an exhausted daily quota
+AUTH_ERROR_STATUSES = (401, 403)
+
+# Catalog genres with fewer IMDb IDs than this are topped up by keyword search
+MIN_CATALOG_SIZE = 50
+
+# On-disk OMDb response cache (SQLite) and its lifetime in seconds
+CACHE_NAME = "omdb_cache"
+CACHE_EXPIRE_AFTER = 86400
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session():
+    """
+    Get the HTTP session shared by all OMDb requests in this process.
+    
+    Concurrent requests reuse its pooled connections. It is backed by an
+    on-disk response cache when requests-cache is installed.
+    
+    Returns:
+        requests.Session: Shared session
+    """
+    # Imported on first use to keep module import and CLI startup fast
+    import requests
+    
+    try:
+        import requests_cache
+        session = requests_cache.CachedSession(
+            CACHE_NAME,
+            expire_after=CACHE_EXPIRE_AFTER,
+            allowable_codes=(200,),
+            stale_if_error=True,
+            # Keep the API key out of cache keys and stored responses
+            ignored_parameters=['apikey']
+        )
+    except ImportError:
+        print("⚠️  requests-cache not installed; OMDb responses won't be cached.")
+        session = requests.Session()
+    
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=4096)
+def _fetch_movie_details(api_key, api_base_url, imdb_id):
+    """
+    Fetch detailed movie information from OMDb, memoized per process.
+    
+    Request errors are raised rather than returned so they are not cached.
+    
+    Args:
+        api_key (str): OMDb API key
+        api_base_url (str): OMDb API URL
+        imdb_id (str): IMDb ID of the movie
+        
+    Returns:
+        Dict: Detailed movie information, or None if OMDb has no such movie
+    """
+    params = {
+        'apikey': api_key,
+        'i': imdb_id,
+        'plot': 'short'
+    }
+    
+    response = _get_session().get(api_base_url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = _loads(response.content)
+    
+    if data.get('Response') == 'True':
+        return {
+            'title': data.get('Title', 'N/A'),
+            'year': data.get('Year', 'N/A'),
+            'genre': data.get('Genre', 'N/A'),
+            'director': data.get('Director', 'N/A'),
+            'plot': data.get('Plot', 'N/A'),
+            'poster': data.get('Poster', 'N/A'),
+            'imdb_rating': data.get('imdbRating', 'N/A'),
+            'imdb_id': imdb_id,
+            'link': f"https://www.imdb.com/title/{imdb_id}/"
+        }
+    
+    return None
+
+
 class MovieRecommender:
     """
     A class to recommend movies based on detected emotions using OMDb API.
     """
     
-    def __init__(self, credentials_file="credentials.json"):
+    def __init__(self, credentials_file="credentials.json", catalog_file="genre_catalog.json"):
         """
         Initialize the movie recommender with API credentials.
         
         Args:
             credentials_file (str): Path to credentials JSON file
+            catalog_file (str): Path to the genre to IMDb ID catalog JSON file
         """
         self.api_key = None
         self.api_base_url = None
         self._load_credentials(credentials_file)
+        self.genre_catalog = self._load_genre_catalog(catalog_file)
+        
+        # Process-wide session shared with the memoized detail lookups
+        self._session = _get_session()
         
-        # Emotion to genre mapping as specified in instructions
+        # Emotion to genre mapping as specified in instructions, frozen as tuples
         self.emotion_genre_mapping = {
-            'joy': ['Comedy', 'Romance', 'Family', 'Animation', 'Musical'],
-            'love': ['Romance', 'Comedy', 'Family', 'Drama'],
-            'sadness': ['Drama', 'Animation', 'Biography', 'Romance'],
-            'anger': ['Comedy', 'Adventure', 'Action', 'Thriller'],
-            'fear': ['Family', 'Fantasy', 'Adventure', 'Animation'],
-            'surprise': ['Mystery', 'Adventure', 'Thriller', 'Sci-Fi'],
-            'neutral': ['Action', 'Adventure', 'Comedy', 'Drama']  # Popular genres for neutral mood
+            'joy': ('Comedy', 'Romance', 'Family', 'Animation', 'Musical'),
+            'love': ('Romance', 'Comedy', 'Family', 'Drama'),
+            'sadness': ('Drama', 'Animation', 'Biography', 'Romance'),
+            'anger': ('Comedy', 'Adventure', 'Action', 'Thriller'),
+            'fear': ('Family', 'Fantasy', 'Adventure', 'Animation'),
+            'surprise': ('Mystery', 'Adventure', 'Thriller', 'Sci-Fi'),
+            'neutral': ('Action', 'Adventure', 'Comedy', 'Drama')  # Popular genres for neutral mood
         }
         
         # Popular movies by genre for better search results
@@ -87,6 +196,27 @@ class MovieRecommender:
             print(f"❌ Error loading credentials: {e}")
             raise
     
+    def _load_genre_catalog(self, catalog_file):
+        """
+        Load the curated IMDb IDs available for each genre.
+        
+        Args:
+            catalog_file (str): Path to catalog file
+            
+        Returns:
+            Dict[str, List[str]]: IMDb IDs per genre, empty if the file is missing
+        """
+        try:
+            with open(catalog_file, 'r') as f:
+                return json.load(f)
+                
+        except FileNotFoundError:
+            print(f"⚠️  Genre catalog '{catalog_file}' not found, using keyword search only.")
+        except Exception as e:
+            print(f"⚠️  Error loading genre catalog: {e}")
+        
+        return {}
+    
     def get_genres_for_emotion(self, emotion):
         """
         Get movie genres that match the detected emotion.
@@ -95,56 +225,201 @@ class MovieRecommender:
             emotion (str): Normalized emotion label
             
         Returns:
-            List[str]: List of matching movie genres
+            Tuple[str, ...]: Matching movie genres
         """
         return self.emotion_genre_mapping.get(emotion, self.emotion_genre_mapping['neutral'])
     
-    def search_movies_by_genre(self, genre, limit=10):
+    def pick_ids_by_genre(self, genre, k, exclude_ids=None):
         """
-        Search for movies by genre using OMDb API.
+        Pick random IMDb IDs for a genre from the curated catalog.
+        
+        Args:
+            genre (str): Movie genre
+            k (int): Number of IDs to pick
+            exclude_ids (set): IMDb IDs that must not be picked
+            
+        Returns:
+            List[str]: Up to k IMDb IDs, fewer if the catalog runs short
+        """
+        exclude_ids = exclude_ids or set()
+        pool = [imdb_id for imdb_id in self.genre_catalog.get(genre, [])
+                if imdb_id not in exclude_ids]
+        return random.sample(pool, min(k, len(pool)))
+    
+    def _build_search_tasks(self, genre):
+        """
+        Build the OMDb search requests used to find movies for a genre.
         
         Args:
             genre (str): Movie genre to search for
-            limit (int): Maximum number of movies to return
             
         Returns:
-            List[Dict]: List of movie dictionaries
+            List[Tuple[str, Dict]]: (url, params) pairs, one per keyword
         """
-        movies = []
-        keywords = self.genre_keywords.get(genre, [genre.lower()])
+        keywords = self.genre_keywords.get(genre, [genre.lower()])[:3]  # Limit to first 3 keywords
         
-        try:
-            # Search with different keywords to get variety
-            for keyword in keywords[:3]:  # Limit to first 3 keywords
-                params = {
-                    'apikey': self.api_key,
-                    's': keyword,
-                    'type': 'movie',
-                    'page': 1
-                }
-                
-                response = requests.get(self.api_base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
+        # Search with different keywords, in random order, to get variety
+        return [
+            (self.api_base_url, {
+                'apikey': self.api_key,
+                's': keyword,
+                'type': 'movie',
+                'page': 1
+            })
+            for keyword in random.sample(keywords, len(keywords))
+        ]
+    
+    def _search(self, url, params):
+        """
+        Run one OMDb search request.
+        
+        Request errors are raised so the caller can count failures.
+        
+        Args:
+            url (str): OMDb API URL
+            params (Dict): Search query parameters
+            
+        Returns:
+            List[str]: IMDb IDs of the matching movies, empty if OMDb found none
+        """
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = _loads(response.content)
+        
+        if data.get('Response') == 'True' and 'Search' in data:
+            return [movie['imdbID'] for movie in data['Search']]
+        
+        return []
+    
+    def _collect_movies(self, genres, limit, exclude_ids=None):
+        """
+        Find movies for all genres concurrently and fetch their details.
+        
+        Candidates come from the genre catalog. Genres with fewer than
+        MIN_CATALOG_SIZE catalog IDs first shuffle in the results of one
+        keyword search. Details are fetched for limit candidates per genre
+        at a time, with another candidate submitted when a lookup comes back
+        empty or fails. A genre that runs out of candidates searches its
+        next keyword, one search at a time. IDs already claimed by another
+        genre are skipped. A genre gives up after MAX_CONSECUTIVE_FAILURES
+        failed requests in a row, and every genre stops on an invalid key or
+        exhausted quota, so an outage can't fan out into requests for the
+        whole catalog.
+        
+        Args:
+            genres (List[str]): Movie genres to search for
+            limit (int): Maximum number of movies to return per genre
+            exclude_ids (set): IMDb IDs to skip without fetching their details
+            
+        Returns:
+            Dict[str, List[Dict]]: Movies found for each genre
+        """
+        movies = {genre: [] for genre in genres}
+        seen = set(exclude_ids or ())
+        
+        # Shuffle the whole catalog pool so claimed IDs can be replaced
+        candidates = {
+            genre: deque(self.pick_ids_by_genre(genre, len(self.genre_catalog.get(genre, [])), seen))
+            for genre in genres
+        }
+        search_tasks = {genre: iter(self._build_search_tasks(genre)) for genre in genres}
+        open_slots = dict.fromkeys(genres, limit)
+        failures = dict.fromkeys(genres, 0)
+        searching = set()
+        stopped = set()
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            
+            def search(genre):
+                # Submit the genre's next keyword search, if it has one left
+                task = next(search_tasks[genre], None)
+                if task is not None:
+                    searching.add(genre)
+                    running[executor.submit(self._search, *task)] = (genre, None)
+            
+            def refill(genre):
+                # Claim candidates for the genre's open slots, searching when out
+                if genre in stopped or genre in searching:
+                    return
                 
-                if data.get('Response') == 'True' and 'Search' in data:
-                    for movie in data['Search']:
-                        if len(movies) >= limit:
-                            break
-                            
-                        # Get detailed movie info
-                        detailed_movie = self.get_movie_details(movie['imdbID'])
-                        if detailed_movie:
-                            movies.append(detailed_movie)
+                while open_slots[genre] and candidates[genre]:
+                    imdb_id = candidates[genre].popleft()
+                    if imdb_id not in seen:
+                        seen.add(imdb_id)
+                        running[executor.submit(self._fetch_details, imdb_id)] = (genre, imdb_id)
+                        open_slots[genre] -= 1
                 
-                if len(movies) >= limit:
-                    break
+                if open_slots[genre]:
+                    search(genre)
+            
+            for genre in genres:
+                if len(self.genre_catalog.get(genre, [])) < MIN_CATALOG_SIZE:
+                    search(genre)
+                refill(genre)
+            
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    genre, imdb_id = running.pop(future)
                     
-        except Exception as e:
-            print(f"❌ Error searching movies for genre '{genre}': {e}")
+                    try:
+                        result = future.result()
+                        failures[genre] = 0
+                        
+                    except Exception as e:
+                        print(f"❌ OMDb request for {genre} failed: {e}")
+                        result = None
+                        failures[genre] += 1
+                        
+                        status = getattr(getattr(e, 'response', None), 'status_code', None)
+                        if status in AUTH_ERROR_STATUSES:
+                            # Every other request would be refused as well
+                            stopped.update(genres)
+                        elif failures[genre] >= MAX_CONSECUTIVE_FAILURES:
+                            print(f"⚠️  Giving up on {genre} after {failures[genre]} failed requests.")
+                            stopped.add(genre)
+                    
+                    if imdb_id is None:
+                        searching.discard(genre)
+                        candidates[genre].extend(result or ())
+                        random.shuffle(candidates[genre])
+                    elif result:
+                        movies[genre].append(result)
+                    else:
+                        open_slots[genre] += 1
+                    
+                    refill(genre)
         
         return movies
     
+    def search_movies_by_genre(self, genre, limit=10, exclude_ids=None):
+        """
+        Search for movies by genre using OMDb API.
+        
+        Args:
+            genre (str): Movie genre to search for
+            limit (int): Maximum number of movies to return
+            exclude_ids (set): IMDb IDs to skip without fetching their details
+            
+        Returns:
+            List[Dict]: List of movie dictionaries
+        """
+        return self._collect_movies([genre], limit, exclude_ids)[genre]
+    
+    def _fetch_details(self, imdb_id):
+        """
+        Get a copy of the memoized movie details, raising on request errors.
+        
+        Args:
+            imdb_id (str): IMDb ID of the movie
+            
+        Returns:
+            Dict: Detailed movie information, or None if OMDb has no such movie
+        """
+        movie = _fetch_movie_details(self.api_key, self.api_base_url, imdb_id)
+        return dict(movie) if movie else None
+    
     def get_movie_details(self, imdb_id):
         """
         Get detailed movie information by IMDb ID.
@@ -156,40 +431,21 @@ class MovieRecommender:
             Dict: Detailed movie information
         """
         try:
-            params = {
-                'apikey': self.api_key,
-                'i': imdb_id,
-                'plot': 'short'
-            }
+            return self._fetch_details(imdb_id)
             
-            response = requests.get(self.api_base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('Response') == 'True':
-                return {
-                    'title': data.get('Title', 'N/A'),
-                    'year': data.get('Year', 'N/A'),
-                    'genre': data.get('Genre', 'N/A'),
-                    'director': data.get('Director', 'N/A'),
-                    'plot': data.get('Plot', 'N/A'),
-                    'poster': data.get('Poster', 'N/A'),
-                    'imdb_rating': data.get('imdbRating', 'N/A'),
-                    'imdb_id': imdb_id,
-                    'link': f"https://www.imdb.com/title/{imdb_id}/"
-                }
         except Exception as e:
             print(f"❌ Error getting movie details for {imdb_id}: {e}")
         
         return None
     
-    def recommend_movies(self, emotion, num_recommendations=3):
+    def recommend_movies(self, emotion, num_recommendations=3, exclude_ids=None):
         """
         Recommend movies based on detected emotion.
         
         Args:
             emotion (str): Normalized emotion label
             num_recommendations (int): Number of movies to recommend
+            exclude_ids (set): IMDb IDs of movies that must not be recommended
             
         Returns:
             List[Dict]: List of recommended movies with details
@@ -203,10 +459,10 @@ class MovieRecommender:
         all_movies = []
         movies_per_genre = max(1, num_recommendations // len(genres)) + 1
         
-        # Search movies for each genre
+        # Search movies for all genres concurrently
+        genre_movies = self._collect_movies(genres, movies_per_genre, exclude_ids)
         for genre in genres:
-            genre_movies = self.search_movies_by_genre(genre, movies_per_genre)
-            all_movies.extend(genre_movies)
+            all_movies.extend(genre_movies[genre])
         
         # Remove duplicates based on IMDb ID
         unique_movies = {}
@@ -214,12 +470,12 @@ class MovieRecommender:
             if movie['imdb_id'] not in unique_movies:
                 unique_movies[movie['imdb_id']] = movie
         
-        # Convert back to list and shuffle for variety
+        # Randomly pick the requested number of recommendations for variety
         unique_movies_list = list(unique_movies.values())
-        random.shuffle(unique_movies_list)
-        
-        # Return requested number of recommendations
-        recommendations = unique_movies_list[:num_recommendations]
+        recommendations = random.sample(
+            unique_movies_list,
+            min(num_recommendations, len(unique_movies_list))
+        )
         
         print(f"✅ Found {len(recommendations)} movie recommendations!")
         return recommendations
@@ -243,19 +499,34 @@ class MovieRecommender:
 
 
 # Convenience functions for easy import
-def recommend_movies(emotion, num_recommendations=3):
+@functools.lru_cache(maxsize=1)
+def get_movie_recommender(credentials_file="credentials.json"):
+    """
+    Get the shared MovieRecommender instance for a credentials file.
+    
+    Args:
+        credentials_file (str): Path to credentials JSON file
+        
+    Returns:
+        MovieRecommender: Process-wide movie recommender
+    """
+    return MovieRecommender(credentials_file)
+
+
+def recommend_movies(emotion, num_recommendations=3, exclude_ids=None):
     """
     Convenience function to get movie recommendations.
     
     Args:
         emotion (str): Detected emotion
         num_recommendations (int): Number of movies to recommend
+        exclude_ids (set): IMDb IDs of movies that must not be recommended
         
     Returns:
         List[Dict]: List of recommended movies
     """
-    recommender = MovieRecommender()
-    return recommender.recommend_movies(emotion, num_recommendations)
+    recommender = get_movie_recommender()
+    return recommender.recommend_movies(emotion, num_recommendations, exclude_ids)
 
 
 def get_emotion_genres(emotion):
@@ -266,9 +537,9 @@ def get_emotion_genres(emotion):
         emotion (str): Emotion label
         
     Returns:
-        List[str]: List of matching genres
+        Tuple[str, ...]: Matching movie genres
     """
-    recommender = MovieRecommender()
+    recommender = get_movie_recommender()
     return recommender.get_genres_for_emotion(emotion)
 
 